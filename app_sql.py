@@ -2,9 +2,9 @@ import streamlit as st
 import duckdb
 import os
 import pandas as pd
-import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime
+from build_db import apply_schema, refresh_course_stats, run_build
 
 st.set_page_config(page_title="GEasy — GE Course Recommender", layout="wide")
 
@@ -38,11 +38,23 @@ st.markdown("""
 st.markdown('<h1 class="main-header">🧠 GEasy — GE Course Recommender</h1>', unsafe_allow_html=True)
 
 DB_PATH = os.environ.get("GEASY_DB_PATH", "geasy.duckdb")
-con = duckdb.connect(DB_PATH)
+DB_MEMORY_LIMIT = os.environ.get("GEASY_DB_MEMORY_LIMIT", "2GB")
+
+# The database handle is shared across sessions, but a DuckDB connection is not
+# thread-safe, so each rerun works through its own cursor on it.
+@st.cache_resource
+def get_connection():
+    """Open the database and apply the schema once, shared across reruns"""
+    con = duckdb.connect(DB_PATH)
+    apply_schema(con)
+    con.execute(f"PRAGMA threads={os.cpu_count() or 4}")
+    con.execute(f"PRAGMA memory_limit='{DB_MEMORY_LIMIT}'")
+    refresh_course_stats(con)
+    return con
 
 # Execute schema
 try:
-    con.execute(open("schema.sql","r", encoding="utf-8").read())
+    con = get_connection().cursor()
     schema_loaded = True
 except FileNotFoundError:
     st.error("❌ Schema file not found. Please ensure schema.sql exists.")
@@ -54,18 +66,89 @@ except Exception as e:
 if not schema_loaded:
     st.stop()
 
-# Check if we have data and offer to load/enhance it
-def check_data_status():
+# Reads the precomputed course_stats table (see build_db.refresh_course_stats),
+# so filter changes never re-run the join and aggregation over all reviews.
+RANKING_QUERY = '''
+SELECT 
+  dept || ' ' || number as course_code,
+  title,
+  professor,
+  review_count,
+  ROUND(avg_quality, 2) as avg_quality,
+  ROUND(avg_workload, 2) as avg_workload,
+  ROUND(score, 2) as score
+FROM course_stats
+WHERE ge_area = ? AND review_count >= ?
+  AND avg_quality >= ? AND avg_workload <= ?
+ORDER BY score DESC, avg_quality DESC
+LIMIT ?
+'''
+
+BASIC_QUERY = '''
+SELECT DISTINCT
+  c.dept || ' ' || c.number as course_code,
+  c.title,
+  'No reviews available' as professor,
+  0 as review_count,
+  0.0 as avg_quality,
+  0.0 as avg_workload,
+  0.0 as score
+FROM courses c
+WHERE c.ge_area = ?
+ORDER BY c.dept, c.number
+LIMIT ?
+'''
+
+# Query results only change when the filters or the data change, so they are
+# memoized across reruns; call st.cache_data.clear() after writing new data.
+@st.cache_data(ttl=300)
+def get_counts(_con):
     """Check what data we have in the database"""
-    try:
-        course_count = con.execute("SELECT COUNT(*) FROM courses").fetchone()[0]
-        review_count = con.execute("SELECT COUNT(*) FROM reviews").fetchone()[0]
-        prof_count = con.execute("SELECT COUNT(*) FROM professors").fetchone()[0]
-        return course_count, review_count, prof_count
-    except:
-        return 0, 0, 0
+    # Errors propagate so a failed check is never cached as "no data"
+    course_count = _con.execute("SELECT COUNT(*) FROM courses").fetchone()[0]
+    review_count = _con.execute("SELECT COUNT(*) FROM reviews").fetchone()[0]
+    prof_count = _con.execute("SELECT COUNT(*) FROM professors").fetchone()[0]
+    return course_count, review_count, prof_count
+
+@st.cache_data(ttl=300)
+def get_areas(_con):
+    """List the distinct GE areas present in the course data"""
+    return [r[0] for r in _con.execute("""
+        SELECT DISTINCT ge_area 
+        FROM courses 
+        WHERE ge_area IS NOT NULL AND ge_area != ''
+        ORDER BY ge_area
+    """).fetchall()]
 
-course_count, review_count, prof_count = check_data_status()
+@st.cache_data(ttl=300)
+def get_area_counts(_con):
+    """Count courses per GE area in a single pass over the courses table"""
+    return dict(_con.execute("""
+        SELECT ge_area, COUNT(*)
+        FROM courses
+        WHERE ge_area IS NOT NULL
+        GROUP BY ge_area
+    """).fetchall())
+
+def fetch_frame(result) -> pd.DataFrame:
+    """Convert a query result to an Arrow-backed DataFrame without boxing values as Python objects"""
+    return result.to_arrow_table().to_pandas(types_mapper=pd.ArrowDtype)
+
+@st.cache_data(ttl=300)
+def run_ranking(_con, area, min_q, max_w, min_reviews, top_n) -> pd.DataFrame:
+    """Rank professor/course pairs in an area by review quality and workload"""
+    return fetch_frame(_con.execute(RANKING_QUERY, [area, min_reviews, min_q, max_w, int(top_n)]))
+
+@st.cache_data(ttl=300)
+def run_course_list(_con, area, top_n) -> pd.DataFrame:
+    """List courses in an area when there are no reviews to rank by"""
+    return fetch_frame(_con.execute(BASIC_QUERY, [area, int(top_n)]))
+
+# Check if we have data and offer to load/enhance it
+try:
+    course_count, review_count, prof_count = get_counts(con)
+except Exception:
+    course_count, review_count, prof_count = 0, 0, 0
 
 # Data status and management section
 st.sidebar.header("📊 Data Status")
@@ -81,19 +164,17 @@ with col3:
 if course_count == 0:
     st.sidebar.warning("⚠️ No course data found")
     if st.sidebar.button("🔄 Load Initial Data", help="Load data from CSV files"):
-        with st.spinner("Loading initial data..."):
+        with st.sidebar.status("Loading initial data...") as status:
             try:
-                # Try to run build_db.py
-                import subprocess
-                result = subprocess.run(['python', 'build_db.py'], capture_output=True, text=True)
-                if result.returncode == 0:
-                    st.sidebar.success("✅ Data loaded successfully!")
-                    time.sleep(1)
-                    st.rerun()
-                else:
-                    st.sidebar.error(f"❌ Error loading data: {result.stderr}")
+                # Load in-process on the open connection rather than a build_db.py subprocess
+                loaded = run_build(con)
+                status.update(label=f"Loaded {loaded:,} rows", state="complete")
+                st.toast("Data loaded successfully!", icon="✅")
+                st.cache_data.clear()
+                st.rerun()
             except Exception as e:
-                st.sidebar.error(f"❌ Error: {e}")
+                status.update(label="Loading failed", state="error")
+                st.sidebar.error(f"❌ Error loading data: {e}")
 
 elif review_count < 100:
     st.sidebar.info("💡 Consider enhancing with BruinWalk reviews")
@@ -114,8 +195,8 @@ elif review_count < 100:
                 progress_bar.progress(1.0)
                 
                 if enhanced_count > 0:
-                    st.sidebar.success(f"✅ Enhanced {enhanced_count} courses!")
-                    time.sleep(2)
+                    st.toast(f"Enhanced {enhanced_count} courses!", icon="✅")
+                    st.cache_data.clear()
                     st.rerun()
                 else:
                     st.sidebar.warning("⚠️ No courses could be enhanced")
@@ -242,12 +323,7 @@ if course_count == 0:
 
 # Get available GE areas
 try:
-    areas = [r[0] for r in con.execute("""
-        SELECT DISTINCT ge_area 
-        FROM courses 
-        WHERE ge_area IS NOT NULL AND ge_area != ''
-        ORDER BY ge_area
-    """).fetchall()]
+    areas = get_areas(con)
 except:
     st.error("❌ Could not load GE areas from database")
     st.stop()
@@ -261,9 +337,10 @@ st.sidebar.header("🔍 Filter Courses")
 area = st.sidebar.selectbox("GE Area", areas)
 
 # Show what this area fulfills
+area_words = area.lower().split()
 fulfills = []
 for req_name, req_count in selected_college["requirements"].items():
-    if req_count > 0 and any(word in req_name.lower() for word in area.lower().split()):
+    if req_count > 0 and any(word in req_name.lower() for word in area_words):
         fulfills.append(f"{req_name} ({req_count} needed)")
 
 if fulfills:
@@ -271,177 +348,15 @@ if fulfills:
 else:
     st.warning(f"⚠️ **{area}** may not fulfill requirements for your college")
 
-# Advanced filters
-with st.sidebar.expander("Advanced Filters"):
-    min_q = st.slider("Min Quality", 1.0, 5.0, 2.5, 0.1)
-    max_w = st.slider("Max Workload", 1, 10, 8)
-    min_reviews = st.slider("Min Reviews", 1, 20, 1)
-    top_n = st.number_input("Results to Show", 1, 100, 20)
-
-# Main query
-if review_count > 0:
-    # If we have reviews, use the full ranking system
-    query = '''
-    WITH course_stats AS (
-      SELECT 
-        c.course_id,
-        c.dept,
-        c.number,
-        c.title, 
-        c.ge_area,
-        p.name AS professor,
-        COUNT(r.review_id) as review_count,
-        AVG(CAST(r.quality AS FLOAT)) AS avg_quality, 
-        AVG(CAST(r.workload AS FLOAT)) AS avg_workload,
-        (AVG(CAST(r.quality AS FLOAT)) * 0.7 + (11 - AVG(CAST(r.workload AS FLOAT))) * 0.3) AS score
-      FROM courses c
-      JOIN sections s ON s.course_id = c.course_id
-      JOIN professors p ON p.prof_id = s.prof_id
-      JOIN reviews r ON r.section_id = s.section_id
-      WHERE c.ge_area = ?
-      GROUP BY c.course_id, c.dept, c.number, c.title, c.ge_area, p.name
-      HAVING COUNT(r.review_id) >= ?
-    )
-    SELECT 
-      dept || ' ' || number as course_code,
-      title,
-      professor,
-      review_count,
-      ROUND(avg_quality, 2) as avg_quality,
-      ROUND(avg_workload, 2) as avg_workload,
-      ROUND(score, 2) as score
-    FROM course_stats
-    WHERE avg_quality >= ? AND avg_workload <= ?
-    ORDER BY score DESC, avg_quality DESC
-    LIMIT ?
-    '''
-    
-    try:
-        df = con.execute(query, [area, min_reviews, min_q, max_w, int(top_n)]).df()
-    except Exception as e:
-        st.error(f"❌ Error with review-based query: {e}")
-        df = pd.DataFrame()
-else:
-    # If no reviews, just show courses by title
-    query = '''
-    SELECT DISTINCT
-      c.dept || ' ' || c.number as course_code,
-      c.title,
-      'No reviews available' as professor,
-      0 as review_count,
-      0.0 as avg_quality,
-      0.0 as avg_workload,
-      0.0 as score
-    FROM courses c
-    WHERE c.ge_area = ?
-    ORDER BY c.dept, c.number
-    LIMIT ?
-    '''
-    
-    try:
-        df = con.execute(query, [area, int(top_n)]).df()
-    except Exception as e:
-        st.error(f"❌ Error with basic query: {e}")
-        df = pd.DataFrame()
-
-# Display results
-if df.empty:
-    st.warning(f"🔍 No courses found for **{area}** with your current filters.")
-    if min_q > 1.0 or max_w < 10 or min_reviews > 1:
-        st.info("💡 Try relaxing your filters to see more results.")
-else:
-    st.header(f"🏆 Best {area} Courses")
-    
-    # Summary stats
-    if review_count > 0:
-        col1, col2, col3, col4 = st.columns(4)
-        with col1:
-            st.metric("Courses Found", len(df))
-        with col2:
-            avg_quality = df['avg_quality'].mean() if df['avg_quality'].sum() > 0 else 0
-            st.metric("Avg Quality", f"{avg_quality:.1f}/5.0")
-        with col3:
-            avg_workload = df['avg_workload'].mean() if df['avg_workload'].sum() > 0 else 0
-            st.metric("Avg Workload", f"{avg_workload:.1f}/10")
-        with col4:
-            total_reviews = df['review_count'].sum()
-            st.metric("Total Reviews", f"{total_reviews:,}")
-        
-        # Visualization if we have meaningful data
-        if df['avg_quality'].sum() > 0:
-            fig = px.scatter(
-                df, 
-                x='avg_workload', 
-                y='avg_quality',
-                size='review_count',
-                color='score',
-                hover_data=['course_code', 'professor'],
-                title="Course Quality vs Workload",
-                labels={
-                    'avg_workload': 'Workload (lower = easier)',
-                    'avg_quality': 'Quality (higher = better)'
-                }
-            )
-            st.plotly_chart(fig, use_container_width=True)
-    
-    # Results table
-    st.subheader("📋 Course List")
-    
-    # Style the dataframe
-    if review_count > 0:
-        # Color code based on scores
-        def highlight_scores(row):
-            styles = []
-            for col in row.index:
-                if col == 'score':
-                    if row[col] >= 7:
-                        styles.append('background-color: #d4edda')
-                    elif row[col] >= 5:
-                        styles.append('background-color: #fff3cd') 
-                    else:
-                        styles.append('background-color: #f8d7da')
-                elif col == 'avg_quality':
-                    if row[col] >= 4:
-                        styles.append('background-color: #d4edda')
-                    elif row[col] >= 3:
-                        styles.append('background-color: #fff3cd')
-                    else:
-                        styles.append('background-color: #f8d7da')
-                elif col == 'avg_workload':
-                    if row[col] <= 4:
-                        styles.append('background-color: #d4edda')
-                    elif row[col] <= 6:
-                        styles.append('background-color: #fff3cd')
-                    else:
-                        styles.append('background-color: #f8d7da')
-                else:
-                    styles.append('')
-            return styles
-        
-        try:
-            styled_df = df.style.apply(highlight_scores, axis=1)
-            st.dataframe(styled_df, use_container_width=True, hide_index=True)
-        except:
-            st.dataframe(df, use_container_width=True, hide_index=True)
-    else:
-        st.dataframe(df, use_container_width=True, hide_index=True)
-    
-    # Export options
-    col1, col2 = st.columns(2)
-    with col1:
-        csv_data = df.to_csv(index=False).encode('utf-8')
-        st.download_button(
-            "📥 Download CSV",
-            csv_data,
-            f"geasy_{area.lower().replace(' ', '_')}.csv",
-            "text/csv"
-        )
-    
-    with col2:
-        # Create a simple report
-        report = f"""# GEasy Recommendations: {area}
+def df_to_csv_bytes(df):
+    """Encode the results as CSV for download"""
+    return df.to_csv(index=False).encode('utf-8')
 
-**College:** {selected_college['name']}
+def build_report(df, area, college_name, min_q, max_w, min_reviews):
+    """Render the results as a markdown report for download"""
+    parts = [f"""# GEasy Recommendations: {area}
+
+**College:** {college_name}
 **Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M')}
 
 ## Filters Applied
@@ -451,23 +366,148 @@ else:
 
 ## Top Courses Found: {len(df)}
 
-"""
-        for idx, row in df.iterrows():
-            report += f"### {row['course_code']} - {row['title']}\n"
-            if row['review_count'] > 0:
-                report += f"- Professor: {row['professor']}\n"
-                report += f"- Quality: {row['avg_quality']}/5.0\n"
-                report += f"- Workload: {row['avg_workload']}/10\n"
-                report += f"- Reviews: {row['review_count']}\n\n"
-            else:
-                report += "- No reviews available\n\n"
+"""]
+    for row in df.itertuples(index=False):
+        parts.append(f"### {row.course_code} - {row.title}\n")
+        if row.review_count > 0:
+            parts.append(f"- Professor: {row.professor}\n"
+                         f"- Quality: {row.avg_quality}/5.0\n"
+                         f"- Workload: {row.avg_workload}/10\n"
+                         f"- Reviews: {row.review_count}\n\n")
+        else:
+            parts.append("- No reviews available\n\n")
+    return "".join(parts).encode('utf-8')
+
+def build_scatter(df):
+    """Plot quality against workload, sized by review count and colored by score"""
+    review_counts = df['review_count'].to_numpy(dtype=float)
+    fig = go.Figure(go.Scattergl(
+        x=df['avg_workload'].to_numpy(dtype=float),
+        y=df['avg_quality'].to_numpy(dtype=float),
+        mode='markers',
+        marker=dict(
+            size=review_counts,
+            sizemode='area',
+            sizeref=2.0 * review_counts.max() / 20 ** 2,
+            color=df['score'].to_numpy(dtype=float),
+            colorscale='Viridis',
+            showscale=True,
+            colorbar=dict(title='score'),
+        ),
+        text=(df['course_code'] + ' — ' + df['professor']).to_numpy(dtype=object),
+        hovertemplate='%{text}<br>Workload: %{x}<br>Quality: %{y}<extra></extra>',
+    ))
+    fig.update_layout(
+        title="Course Quality vs Workload",
+        xaxis_title='Workload (lower = easier)',
+        yaxis_title='Quality (higher = better)'
+    )
+    return fig
+
+# Filters and results run as a fragment, so moving a slider reruns only this
+# panel instead of the whole page.
+@st.fragment
+def results_panel(con, area, selected_college, review_count):
+    """Render the filter controls, ranked results, chart and exports"""
+    # Advanced filters
+    with st.expander("Advanced Filters"):
+        min_q = st.slider("Min Quality", 1.0, 5.0, 2.5, 0.1)
+        max_w = st.slider("Max Workload", 1, 10, 8)
+        min_reviews = st.slider("Min Reviews", 1, 20, 1)
+        top_n = st.number_input("Results to Show", 1, 100, 20)
+
+    # Main query
+    if review_count > 0:
+        # If we have reviews, use the full ranking system
+        try:
+            df = run_ranking(con, area, min_q, max_w, min_reviews, top_n)
+        except Exception as e:
+            st.error(f"❌ Error with review-based query: {e}")
+            df = pd.DataFrame()
+    else:
+        # If no reviews, just show courses by title
+        try:
+            df = run_course_list(con, area, top_n)
+        except Exception as e:
+            st.error(f"❌ Error with basic query: {e}")
+            df = pd.DataFrame()
+
+    # Display results
+    if df.empty:
+        st.warning(f"🔍 No courses found for **{area}** with your current filters.")
+        if min_q > 1.0 or max_w < 10 or min_reviews > 1:
+            st.info("💡 Try relaxing your filters to see more results.")
+    else:
+        st.header(f"🏆 Best {area} Courses")
+    
+        # Summary stats
+        if review_count > 0:
+            # Each reduction runs once and is shared by the metrics and the chart guard
+            quality_sum = df['avg_quality'].sum()
+            workload_sum = df['avg_workload'].sum()
+            has_quality = quality_sum > 0
         
-        st.download_button(
-            "📄 Download Report",
-            report.encode('utf-8'),
-            f"geasy_{area.lower().replace(' ', '_')}_report.md",
-            "text/markdown"
-        )
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.metric("Courses Found", len(df))
+            with col2:
+                avg_quality = df['avg_quality'].mean() if has_quality else 0
+                st.metric("Avg Quality", f"{avg_quality:.1f}/5.0")
+            with col3:
+                avg_workload = df['avg_workload'].mean() if workload_sum > 0 else 0
+                st.metric("Avg Workload", f"{avg_workload:.1f}/10")
+            with col4:
+                total_reviews = int(df['review_count'].sum())
+                st.metric("Total Reviews", f"{total_reviews:,}")
+        
+            # Visualization if we have meaningful data
+            if has_quality:
+                st.plotly_chart(build_scatter(df), use_container_width=True)
+    
+        # Results table
+        st.subheader("📋 Course List")
+    
+        # Let Streamlit render the ratings client-side instead of styling cells in pandas
+        if review_count > 0:
+            st.dataframe(
+                df,
+                column_config={
+                    'avg_quality': st.column_config.ProgressColumn(
+                        'Quality', min_value=0, max_value=5, format='%.2f'
+                    ),
+                    'avg_workload': st.column_config.ProgressColumn(
+                        'Workload', min_value=0, max_value=10, format='%.2f'
+                    ),
+                    'score': st.column_config.NumberColumn('Score', format='%.2f'),
+                },
+                use_container_width=True,
+                hide_index=True
+            )
+        else:
+            st.dataframe(df, use_container_width=True, hide_index=True)
+    
+        # Export options
+        col1, col2 = st.columns(2)
+        with col1:
+            csv_data = df_to_csv_bytes(df)
+            st.download_button(
+                "📥 Download CSV",
+                csv_data,
+                f"geasy_{area.lower().replace(' ', '_')}.csv",
+                "text/csv"
+            )
+    
+        with col2:
+            report_bytes = build_report(df, area, selected_college['name'], min_q, max_w, min_reviews)
+        
+            st.download_button(
+                "📄 Download Report",
+                report_bytes,
+                f"geasy_{area.lower().replace(' ', '_')}_report.md",
+                "text/markdown"
+            )
+
+results_panel(con, area, selected_college, review_count)
 
 # Help section
 with st.expander("❓ How to Use GEasy"):
@@ -535,11 +575,9 @@ if st.sidebar.checkbox("🔧 Show Debug Info"):
         
     with col2:
         st.write("**Available GE Areas:**")
+        counts_by_area = get_area_counts(con)
         for area in areas:
-            course_count_for_area = con.execute(
-                "SELECT COUNT(*) FROM courses WHERE ge_area = ?", [area]
-            ).fetchone()[0]
-            st.write(f"- {area}: {course_count_for_area} courses")
+            st.write(f"- {area}: {counts_by_area.get(area, 0)} courses")
     
     if st.button("Test Database Connection"):
         try:
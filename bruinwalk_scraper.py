@@ -1,25 +1,137 @@
+import asyncio
+import aiohttp
 import requests
-from bs4 import BeautifulSoup
+import requests_cache
+from aiohttp_client_cache import CachedSession, SQLiteBackend
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import lxml.html
+from lxml import etree
 import time
+import functools
 import pandas as pd
 import re
 import json
 import duckdb
 import logging
+from email.utils import parsedate_to_datetime
 from typing import Dict, List, Optional, Tuple
 from urllib.parse import urljoin, quote
+from build_db import refresh_course_stats
+
+# Only advertise brotli when requests/aiohttp can decode it
+try:
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = 'gzip, deflate, br'
+except ImportError:
+    ACCEPT_ENCODING = 'gzip, deflate'
+
+# XPath expressions are compiled once at import and evaluated by libxml2 per page
+_CLASS = "translate(@class, 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz')"
+
+# Likely page content containers; professor lookups stay inside the first one present
+_CONTENT_XPATH = etree.XPath(
+    "(//main | //*[@id='content']"
+    " | //*[contains(concat(' ', normalize-space(@class), ' '), ' course-content ')])[1]"
+)
+_PROFESSOR_XPATH = etree.XPath(f".//div[contains({_CLASS}, 'professor') or contains({_CLASS}, 'instructor')]")
+_DATA_PROFESSOR_XPATH = etree.XPath('.//div[@data-professor]')
+_H3_XPATH = etree.XPath('.//h3')
+_NAME_HEADING_XPATH = etree.XPath('(.//h3 | .//h4)[1]')
+_NAME_CLASS_XPATH = etree.XPath(f"(.//*[contains({_CLASS}, 'name') or contains({_CLASS}, 'professor')])[1]")
+_REVIEW_XPATH = etree.XPath(f".//div[contains({_CLASS}, 'review')]")
+
+# Visible text nodes, leaving out script and style bodies like BeautifulSoup's get_text;
+# plain strings, since nothing needs to walk back from a string to its element
+_TEXT_XPATH = etree.XPath('.//text()[not(parent::script or parent::style)]', smart_strings=False)
+
+# Pages are cached on disk so re-runs and retries only hit the network for new courses
+CACHE_EXPIRE_AFTER = 60 * 60 * 24 * 7  # 1 week
+CACHE_CODES = (200, 404)
+
+# Responses worth retrying with backoff: throttling and transient server errors
+RETRY_STATUSES = [429, 500, 502, 503, 504]
+
+# Patterns are compiled once at import rather than looked up in re's cache per review
+_RATING_TEXT_RE = re.compile(r'\d+(\.\d+)?.*?/.*?5')
+
+# Rating phrasings in priority order; kept as separate patterns because a
+# single alternation lets "7/10 ... workload" swallow a quality phrase in between
+_QUALITY_RES = [re.compile(p, re.I) for p in (
+    r'(\d+(?:\.\d+)?)\s*/\s*5',  # "4.5/5"
+    r'(\d+(?:\.\d+)?)\s*out\s*of\s*5',  # "4 out of 5"
+    r'rating:?\s*(\d+(?:\.\d+)?)',  # "Rating: 4.2"
+    r'quality:?\s*(\d+(?:\.\d+)?)',  # "Quality: 4.2"
+)]
+_WORKLOAD_RES = [re.compile(p, re.I) for p in (
+    r'workload:?\s*(\d+(?:\.\d+)?)',  # "Workload: 3.5"
+    r'difficulty:?\s*(\d+(?:\.\d+)?)',  # "Difficulty: 7"
+    r'(\d+(?:\.\d+)?)\s*/\s*10.*?(?:workload|difficulty)',  # "7/10 difficulty"
+)]
+
+_QUARTER_RE = re.compile(r'(fall|winter|spring|summer)\s*(\d{4})', re.I)
+_GRADE_RE = re.compile(r'\b([A-F][+-]?|P|NP)\b')
+
+# Department spaces and ampersands in one translate pass
+_SLUG_TABLE = str.maketrans({' ': '-', '&': 'and'})
+
+def _text(elem, separator: str = '') -> str:
+    """Element text; with a separator, each string is stripped and blanks are dropped"""
+    strings = _TEXT_XPATH(elem)
+    if separator:
+        return separator.join(s for s in (s.strip() for s in strings) if s)
+    return ''.join(strings).strip()
+
+def _only_string(elem) -> Optional[str]:
+    """The element's text when its only content is a single string, like BeautifulSoup's .string"""
+    while len(elem):
+        if len(elem) > 1 or elem.text or elem[0].tail:
+            return None
+        elem = elem[0]
+    return elem.text
+
+def _parse_page(content: bytes):
+    """Parse a page body into an lxml element tree"""
+    return lxml.html.document_fromstring(content, parser=lxml.html.HTMLParser(encoding='utf-8'))
+
+@functools.lru_cache(maxsize=4096)
+def _url_slug(dept: str, number: str) -> str:
+    """BruinWalk URL slug for a course, memoized across repeated pairs"""
+    return f"{dept.strip().lower().translate(_SLUG_TABLE)}-{number.strip().lower()}"
 
 class BruinWalkEnhancer:
     """
     Enhanced BruinWalk scraper that works with your existing course data
     """
     
-    def __init__(self, delay=2.0):
+    def __init__(self, delay=2.0, concurrency=8, max_retries=5):
         self.base_url = "https://bruinwalk.com"
         self.delay = delay
-        self.session = requests.Session()
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.session = requests_cache.CachedSession(
+            'bruinwalk_cache', backend='sqlite',
+            expire_after=CACHE_EXPIRE_AFTER,
+            allowable_codes=CACHE_CODES,
+            stale_if_error=True
+        )
+        
+        # Reuse pooled keep-alive connections to BruinWalk and back off on throttling/server errors
+        adapter = HTTPAdapter(
+            pool_connections=2,
+            pool_maxsize=concurrency,
+            max_retries=Retry(
+                total=max_retries,
+                backoff_factor=1.0,
+                status_forcelist=RETRY_STATUSES,
+                allowed_methods=['GET']
+            )
+        )
+        self.session.mount('https://', adapter)
         self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+            'Connection': 'keep-alive',
+            'Accept-Encoding': ACCEPT_ENCODING
         })
         
         logging.basicConfig(level=logging.INFO)
@@ -30,10 +142,7 @@ class BruinWalkEnhancer:
         Convert course department and number to BruinWalk URL slug
         e.g., 'COM SCI' + '174A' -> 'com-sci-174a'
         """
-        # Clean and format department
-        dept_clean = dept.strip().lower().replace(' ', '-').replace('&', 'and')
-        number_clean = number.strip().lower()
-        return f"{dept_clean}-{number_clean}"
+        return _url_slug(dept, number)
     
     def get_course_reviews(self, dept: str, number: str) -> Optional[Dict]:
         """
@@ -56,9 +165,19 @@ class BruinWalkEnhancer:
                 return None
                 
             response.raise_for_status()
-            time.sleep(self.delay)
+            if not response.from_cache:
+                time.sleep(self.delay)
             
-            soup = BeautifulSoup(response.content, 'html.parser')
+        except requests.RequestException as e:
+            self.logger.error(f"Error fetching {course_url}: {e}")
+            return None
+        
+        return self._parse_course_page(response.content, dept, number, course_url)
+    
+    def _parse_course_page(self, content: bytes, dept: str, number: str, course_url: str) -> Optional[Dict]:
+        """Extract the course title, professors and reviews from a BruinWalk course page"""
+        try:
+            page = _parse_page(content)
             
             course_data = {
                 'dept': dept,
@@ -73,41 +192,46 @@ class BruinWalkEnhancer:
             }
             
             # Extract course title
-            title_elem = soup.find('h1') or soup.find('title')
-            if title_elem:
-                title_text = title_elem.get_text().strip()
+            title_elem = page.find('.//h1')
+            if title_elem is None:
+                title_elem = page.find('.//title')
+            if title_elem is not None:
+                title_text = _text(title_elem)
                 # Remove course code from title if present
                 if ' - ' in title_text:
                     course_data['title'] = title_text.split(' - ', 1)[-1]
                 else:
                     course_data['title'] = title_text
             
-            # Find all professor sections
-            prof_sections = soup.find_all('div', class_=re.compile(r'professor|instructor', re.I))
+            # Find all professor sections, skipping navigation and footers where possible
+            containers = _CONTENT_XPATH(page)
+            root = containers[0] if containers else page
+            prof_sections = _PROFESSOR_XPATH(root)
             if not prof_sections:
                 # Try alternative selectors
-                prof_sections = soup.find_all('div', attrs={'data-professor': True})
+                prof_sections = _DATA_PROFESSOR_XPATH(root)
                 if not prof_sections:
-                    prof_sections = soup.find_all('h3')  # Fallback to h3 headers
+                    prof_sections = _H3_XPATH(root)  # Fallback to h3 headers
+            
+            # Running (total, count) of rated reviews for the overall rating
+            quality_total = 0.0
+            rated = 0
             
             for prof_section in prof_sections:
                 prof_data = self._extract_professor_reviews(prof_section, dept, number)
                 if prof_data and prof_data['reviews']:
                     course_data['professors'].append(prof_data)
                     course_data['reviews'].extend(prof_data['reviews'])
+                    for review in prof_data['reviews']:
+                        if review['quality'] > 0:
+                            quality_total += review['quality']
+                            rated += 1
             
             course_data['total_reviews'] = len(course_data['reviews'])
-            
-            # Calculate overall rating
-            if course_data['reviews']:
-                qualities = [r['quality'] for r in course_data['reviews'] if r['quality'] > 0]
-                course_data['overall_rating'] = sum(qualities) / len(qualities) if qualities else 0.0
+            course_data['overall_rating'] = quality_total / rated if rated else 0.0
             
             return course_data if course_data['total_reviews'] > 0 else None
             
-        except requests.RequestException as e:
-            self.logger.error(f"Error fetching {course_url}: {e}")
-            return None
         except Exception as e:
             self.logger.error(f"Error parsing course data for {dept} {number}: {e}")
             return None
@@ -122,25 +246,32 @@ class BruinWalkEnhancer:
             }
             
             # Extract professor name
-            name_elem = section.find(['h3', 'h4']) or section.find(class_=re.compile(r'name|professor', re.I))
-            if name_elem:
-                prof_data['name'] = name_elem.get_text().strip()
+            name_elems = _NAME_HEADING_XPATH(section) or _NAME_CLASS_XPATH(section)
+            if name_elems:
+                prof_data['name'] = _text(name_elems[0])
             
             # Find review elements
-            review_elements = section.find_all('div', class_=re.compile(r'review', re.I))
+            review_elements = _REVIEW_XPATH(section)
             if not review_elements:
                 # Alternative: look for rating patterns
-                review_elements = section.find_all('div', string=re.compile(r'\d+(\.\d+)?.*?/.*?5'))
+                review_elements = [
+                    div for div in section.iterdescendants('div')
+                    if _RATING_TEXT_RE.search(_only_string(div) or '')
+                ]
+            
+            # Professor average rating, accumulated as reviews are parsed
+            quality_total = 0.0
+            rated = 0
             
             for review_elem in review_elements:
                 review_data = self._parse_review_element(review_elem, prof_data['name'], dept, number)
                 if review_data:
                     prof_data['reviews'].append(review_data)
+                    if review_data['quality'] > 0:
+                        quality_total += review_data['quality']
+                        rated += 1
             
-            # Calculate professor average rating
-            if prof_data['reviews']:
-                qualities = [r['quality'] for r in prof_data['reviews'] if r['quality'] > 0]
-                prof_data['rating'] = sum(qualities) / len(qualities) if qualities else 0.0
+            prof_data['rating'] = quality_total / rated if rated else 0.0
             
             return prof_data if prof_data['reviews'] else None
             
@@ -164,63 +295,31 @@ class BruinWalkEnhancer:
                 'would_recommend': None
             }
             
-            # Extract review text
-            text_elem = elem.find(string=True) or elem
-            if hasattr(text_elem, 'get_text'):
-                review_data['text'] = text_elem.get_text().strip()[:500]  # Limit length
-            elif isinstance(text_elem, str):
-                review_data['text'] = text_elem.strip()[:500]
-            
-            # Extract numerical ratings using regex
-            text_content = elem.get_text() if hasattr(elem, 'get_text') else str(elem)
-            
-            # Look for rating patterns (e.g., "4.5/5", "3 out of 5", "Rating: 4.2")
-            quality_patterns = [
-                r'(\d+(?:\.\d+)?)\s*/\s*5',  # "4.5/5"
-                r'(\d+(?:\.\d+)?)\s*out\s*of\s*5',  # "4 out of 5"
-                r'rating:?\s*(\d+(?:\.\d+)?)',  # "Rating: 4.2"
-                r'quality:?\s*(\d+(?:\.\d+)?)',  # "Quality: 4.2"
-            ]
-            
-            for pattern in quality_patterns:
-                match = re.search(pattern, text_content, re.I)
-                if match:
-                    try:
-                        rating = float(match.group(1))
-                        if 0 <= rating <= 5:
-                            review_data['quality'] = rating
-                            break
-                    except (ValueError, IndexError):
-                        continue
-            
-            # Look for workload/difficulty patterns
-            workload_patterns = [
-                r'workload:?\s*(\d+(?:\.\d+)?)',  # "Workload: 3.5"
-                r'difficulty:?\s*(\d+(?:\.\d+)?)',  # "Difficulty: 7"
-                r'(\d+(?:\.\d+)?)\s*/\s*10.*?(?:workload|difficulty)',  # "7/10 difficulty"
-            ]
-            
-            for pattern in workload_patterns:
-                match = re.search(pattern, text_content, re.I)
-                if match:
-                    try:
-                        workload = float(match.group(1))
-                        if 0 <= workload <= 10:
-                            review_data['workload'] = workload
-                            break
-                    except (ValueError, IndexError):
-                        continue
+            # Walk the element once; the same text feeds the review body and every regex
+            text_content = _text(elem, ' ')
+            review_data['text'] = text_content[:500]  # Limit length
+            
+            # Extract numerical ratings using regex; the first pattern with an in-range match wins
+            for pattern in _QUALITY_RES:
+                match = pattern.search(text_content)
+                if match and 0 <= float(match.group(1)) <= 5:
+                    review_data['quality'] = float(match.group(1))
+                    break
+            
+            for pattern in _WORKLOAD_RES:
+                match = pattern.search(text_content)
+                if match and 0 <= float(match.group(1)) <= 10:
+                    review_data['workload'] = float(match.group(1))
+                    break
             
             # Extract quarter/year
-            quarter_pattern = r'(fall|winter|spring|summer)\s*(\d{4})'
-            quarter_match = re.search(quarter_pattern, text_content, re.I)
+            quarter_match = _QUARTER_RE.search(text_content)
             if quarter_match:
                 review_data['quarter'] = quarter_match.group(1).title()
                 review_data['year'] = int(quarter_match.group(2))
             
             # Extract grade
-            grade_pattern = r'\b([A-F][+-]?|P|NP)\b'
-            grade_match = re.search(grade_pattern, text_content)
+            grade_match = _GRADE_RE.search(text_content)
             if grade_match:
                 review_data['grade'] = grade_match.group(1)
             
@@ -246,46 +345,147 @@ class BruinWalkEnhancer:
             Number of courses successfully enhanced
         """
         con = duckdb.connect(db_path)
-        
-        # Get existing courses
         try:
-            courses_df = con.execute("""
-                SELECT DISTINCT dept, number, title, ge_area 
-                FROM courses 
-                WHERE dept IS NOT NULL AND number IS NOT NULL
-                ORDER BY dept, number
-                LIMIT ?
-            """, [limit]).df()
-        except:
-            self.logger.error("Could not read existing courses from database")
-            return 0
+            # Get existing courses
+            try:
+                courses_df = con.execute("""
+                    SELECT DISTINCT dept, number, ge_area 
+                    FROM courses 
+                    WHERE dept IS NOT NULL AND number IS NOT NULL
+                    ORDER BY dept, number
+                    LIMIT ?
+                """, [limit]).df()
+            except:
+                self.logger.error("Could not read existing courses from database")
+                return 0
+            
+            self._prime_run_state(con)
+            enhanced_count = asyncio.run(self._enhance_courses(courses_df, con))
+            
+            if enhanced_count > 0:
+                refresh_course_stats(con)
+        finally:
+            con.close()
         
+        self.logger.info(f"Enhanced {enhanced_count} courses with BruinWalk data")
+        return enhanced_count
+    
+    async def _enhance_courses(self, courses_df: pd.DataFrame, con) -> int:
+        """Fetch course pages concurrently and save each result as it arrives"""
+        semaphore = asyncio.Semaphore(self.concurrency)
+        connector = aiohttp.TCPConnector(limit_per_host=self.concurrency, keepalive_timeout=85)
+        cache = SQLiteBackend(
+            'bruinwalk_async_cache',
+            expire_after=CACHE_EXPIRE_AFTER,
+            allowed_codes=CACHE_CODES
+        )
         enhanced_count = 0
         
-        for idx, course in courses_df.iterrows():
-            self.logger.info(f"Enhancing {course['dept']} {course['number']} ({idx+1}/{len(courses_df)})")
-            
-            # Get BruinWalk data for this course
-            bruinwalk_data = self.get_course_reviews(course['dept'], course['number'])
-            
-            if bruinwalk_data and bruinwalk_data['reviews']:
-                # Add this course's BruinWalk data to database
-                self._save_course_to_db(bruinwalk_data, course['ge_area'], con)
-                enhanced_count += 1
-                self.logger.info(f"✅ Enhanced {course['dept']} {course['number']} with {len(bruinwalk_data['reviews'])} reviews")
-            else:
-                self.logger.warning(f"⚠️  No BruinWalk data found for {course['dept']} {course['number']}")
-            
-            # Rate limiting
-            time.sleep(self.delay)
+        async with CachedSession(cache=cache, headers=dict(self.session.headers), connector=connector) as session:
+            rows = courses_df[['dept', 'number', 'ge_area']].itertuples(index=False, name=None)
+            tasks = [self._fetch_course(session, semaphore, course) for course in rows]
+            
+            # Database writes stay on this one coroutine; only fetching and parsing run concurrently
+            for done, task in enumerate(asyncio.as_completed(tasks), start=1):
+                (dept, number, ge_area), bruinwalk_data = await task
+                self.logger.info(f"Fetched {dept} {number} ({done}/{len(tasks)})")
+                
+                if bruinwalk_data and bruinwalk_data['reviews']:
+                    # Add this course's BruinWalk data to database
+                    self._save_course_to_db(bruinwalk_data, ge_area, con)
+                    enhanced_count += 1
+                    self.logger.info(f"✅ Enhanced {dept} {number} with {len(bruinwalk_data['reviews'])} reviews")
+                else:
+                    self.logger.warning(f"⚠️  No BruinWalk data found for {dept} {number}")
         
-        con.close()
-        self.logger.info(f"Enhanced {enhanced_count} courses with BruinWalk data")
         return enhanced_count
     
+    async def _fetch_course(self, session: aiohttp.ClientSession, semaphore: asyncio.Semaphore,
+                            course: Tuple[str, str, str]) -> Tuple[Tuple[str, str, str], Optional[Dict]]:
+        """Download one (dept, number, ge_area) course page under the concurrency limit and parse it off the event loop"""
+        dept, number, _ = course
+        slug = self.course_to_url_slug(dept, number)
+        course_url = f"{self.base_url}/classes/{slug}/"
+        
+        async with semaphore:
+            # Any failure, network or response cache, skips just this course
+            try:
+                content, from_cache = await self._fetch_page(session, course_url)
+            except Exception as e:
+                self.logger.error(f"Error fetching {course_url}: {e}")
+                content, from_cache = None, False
+            
+            # Rate limiting, per concurrent slot; cached pages never touched the network
+            if not from_cache:
+                await asyncio.sleep(self.delay)
+        
+        if content is None:
+            return course, None
+        
+        loop = asyncio.get_running_loop()
+        bruinwalk_data = await loop.run_in_executor(
+            None, self._parse_course_page, content, dept, number, course_url
+        )
+        return course, bruinwalk_data
+    
+    async def _fetch_page(self, session: aiohttp.ClientSession, url: str) -> Tuple[Optional[bytes], bool]:
+        """
+        GET a page, retrying throttled or failed responses
+        
+        Returns:
+            (content, from_cache); content is None if the page does not exist
+        """
+        for attempt in range(self.max_retries + 1):
+            async with session.get(url) as response:
+                from_cache = getattr(response, 'from_cache', False)
+                if response.status == 404:
+                    self.logger.warning(f"Page not found on BruinWalk: {url}")
+                    return None, from_cache
+                
+                if response.status in RETRY_STATUSES and attempt < self.max_retries:
+                    wait = self._retry_delay(response.headers, attempt)
+                    self.logger.warning(f"HTTP {response.status} from {url}, retrying in {wait:.1f}s")
+                    await asyncio.sleep(wait)
+                    continue
+                
+                response.raise_for_status()
+                return await response.read(), from_cache
+    
+    def _retry_delay(self, headers, attempt: int) -> float:
+        """Seconds to wait before a retry, preferring the server's rate-limit headers"""
+        for header in ('Retry-After', 'X-RateLimit-Reset'):
+            value = headers.get(header)
+            if not value:
+                continue
+            try:
+                seconds = float(value)
+                # X-RateLimit-Reset is often an epoch timestamp rather than a delay
+                if seconds > 1e9:
+                    seconds -= time.time()
+            except ValueError:
+                try:
+                    seconds = parsedate_to_datetime(value).timestamp() - time.time()
+                except (TypeError, ValueError):
+                    continue
+            return max(seconds, 0.0)
+        
+        # Exponential backoff, matching the requests session's Retry(backoff_factor=1.0)
+        return 2.0 ** attempt
+    
+    def _prime_run_state(self, con):
+        """Read the professor lookup and next free ids once per run for _save_course_to_db"""
+        self._prof_cache = dict(con.execute("SELECT name, prof_id FROM professors").fetchall())
+        self._next_course_id = con.execute("SELECT COALESCE(MAX(course_id), 0) + 1 FROM courses").fetchone()[0]
+        self._next_prof_id = con.execute("SELECT COALESCE(MAX(prof_id), 0) + 1 FROM professors").fetchone()[0]
+        self._next_section_id = con.execute("SELECT COALESCE(MAX(section_id), 0) + 1 FROM sections").fetchone()[0]
+        self._next_review_id = con.execute("SELECT COALESCE(MAX(review_id), 0) + 1 FROM reviews").fetchone()[0]
+    
     def _save_course_to_db(self, course_data: Dict, ge_area: str, con):
         """Save BruinWalk course data to database"""
         try:
+            # One transaction per course, so a failure leaves no partial rows behind
+            con.execute("BEGIN TRANSACTION")
+            
             # Get or create course
             course_result = con.execute("""
                 SELECT course_id FROM courses 
@@ -296,59 +496,71 @@ class BruinWalkEnhancer:
                 course_id = course_result[0]
             else:
                 # Insert new course
-                course_id = con.execute("SELECT MAX(course_id) + 1 FROM courses").fetchone()[0] or 1
+                course_id = self._next_course_id
+                self._next_course_id += 1
                 con.execute("""
                     INSERT INTO courses (course_id, dept, number, title, ge_area)
                     VALUES (?, ?, ?, ?, ?)
                 """, [course_id, course_data['dept'], course_data['number'], 
                      course_data.get('title', ''), ge_area])
             
-            # Process reviews by professor
-            professor_cache = {}
+            # Professors first seen in this course; merged into the run cache after commit
+            new_profs = {}
             
-            # Get existing professors
-            existing_profs = con.execute("SELECT prof_id, name FROM professors").fetchall()
-            for prof_id, name in existing_profs:
-                professor_cache[name] = prof_id
-            
-            next_prof_id = con.execute("SELECT MAX(prof_id) + 1 FROM professors").fetchone()[0] or 1
-            next_section_id = con.execute("SELECT MAX(section_id) + 1 FROM sections").fetchone()[0] or 1
-            next_review_id = con.execute("SELECT MAX(review_id) + 1 FROM reviews").fetchone()[0] or 1
+            professor_rows = []
+            section_rows = []
+            review_rows = []
             
             for review in course_data['reviews']:
                 prof_name = review['professor']
                 
                 # Get or create professor
-                if prof_name not in professor_cache:
-                    con.execute("""
-                        INSERT INTO professors (prof_id, name)
-                        VALUES (?, ?)
-                    """, [next_prof_id, prof_name])
-                    professor_cache[prof_name] = next_prof_id
-                    next_prof_id += 1
-                
-                current_prof_id = professor_cache[prof_name]
+                current_prof_id = self._prof_cache.get(prof_name)
+                if current_prof_id is None:
+                    current_prof_id = new_profs.get(prof_name)
+                if current_prof_id is None:
+                    current_prof_id = self._next_prof_id
+                    professor_rows.append((current_prof_id, prof_name))
+                    new_profs[prof_name] = current_prof_id
+                    self._next_prof_id += 1
                 
-                # Insert section
-                con.execute("""
-                    INSERT INTO sections (section_id, course_id, prof_id, term, year)
-                    VALUES (?, ?, ?, ?, ?)
-                """, [next_section_id, course_id, current_prof_id, 
-                     review.get('quarter', 'Unknown'), review.get('year', 2024)])
+                section_rows.append((self._next_section_id, course_id, current_prof_id,
+                                     review.get('quarter', 'Unknown'), review.get('year', 2024)))
                 
-                # Insert review - convert ratings to expected scales
+                # Convert ratings to expected scales
                 quality = max(1, min(5, int(review.get('quality', 3))))
                 workload = max(1, min(10, int(review.get('workload', 5)) if review.get('workload', 0) > 0 else 5))
                 
-                con.execute("""
-                    INSERT INTO reviews (review_id, section_id, quality, workload, text)
-                    VALUES (?, ?, ?, ?, ?)
-                """, [next_review_id, next_section_id, quality, workload, review.get('text', '')[:500]])
+                review_rows.append((self._next_review_id, self._next_section_id, quality, workload,
+                                    review.get('text', '')[:500]))
                 
-                next_section_id += 1
-                next_review_id += 1
+                self._next_section_id += 1
+                self._next_review_id += 1
+            
+            # Append each table in a single statement; DuckDB scans the DataFrames in place
+            professors_df = pd.DataFrame(professor_rows, columns=['prof_id', 'name'])
+            sections_df = pd.DataFrame(section_rows, columns=['section_id', 'course_id', 'prof_id', 'term', 'year'])
+            reviews_df = pd.DataFrame(review_rows, columns=['review_id', 'section_id', 'quality', 'workload', 'text'])
+            
+            if professor_rows:
+                con.execute("INSERT INTO professors (prof_id, name) SELECT * FROM professors_df")
+            con.execute("""
+                INSERT INTO sections (section_id, course_id, prof_id, term, year)
+                SELECT * FROM sections_df
+            """)
+            con.execute("""
+                INSERT INTO reviews (review_id, section_id, quality, workload, text)
+                SELECT * FROM reviews_df
+            """)
+            
+            con.execute("COMMIT")
+            self._prof_cache.update(new_profs)
                 
         except Exception as e:
+            try:
+                con.execute("ROLLBACK")
+            except duckdb.Error:
+                pass
             self.logger.error(f"Error saving course to database: {e}")
 
 
@@ -1,10 +1,87 @@
-
-import duckdb, os
+import csv, duckdb, os
 DB_PATH = os.environ.get("GEASY_DB_PATH", "geasy.duckdb")
 DATA_DIR = os.environ.get("GEASY_DATA_DIR", "data")
-con = duckdb.connect(DB_PATH)
-con.execute(open("schema.sql","r", encoding="utf-8").read())
-for name in ["courses","professors","sections","reviews"]:
-    con.execute(f"CREATE OR REPLACE TEMP VIEW src AS SELECT * FROM read_csv_auto('{DATA_DIR}/{name}.csv', header=True)")
-    con.execute(f"INSERT OR REPLACE INTO {name} SELECT * FROM src")
-print(f"Built DuckDB at {DB_PATH}")
+TABLES = ["courses","professors","sections","reviews"]
+
+COURSE_STATS_QUERY = '''
+INSERT INTO course_stats
+-- The app only ever ranks courses that have a GE area, so drop the rest
+-- before the joins rather than aggregating them and never reading them
+WITH ge_courses AS (
+  SELECT course_id, dept, number, title, ge_area
+  FROM courses
+  WHERE ge_area IS NOT NULL AND ge_area != ''
+)
+SELECT
+  c.course_id,
+  p.prof_id,
+  ANY_VALUE(c.dept) AS dept,
+  ANY_VALUE(c.number) AS number,
+  ANY_VALUE(c.title) AS title,
+  ANY_VALUE(c.ge_area) AS ge_area,
+  ANY_VALUE(p.name) AS professor,
+  COUNT(r.review_id) AS review_count,
+  AVG(CAST(r.quality AS FLOAT)) AS avg_quality,
+  AVG(CAST(r.workload AS FLOAT)) AS avg_workload,
+  avg_quality * 0.7 + (11 - avg_workload) * 0.3 AS score
+FROM ge_courses c
+JOIN sections s ON s.course_id = c.course_id
+JOIN professors p ON p.prof_id = s.prof_id
+JOIN reviews r ON r.section_id = s.section_id
+-- course_id and prof_id determine the descriptive columns, so only the keys are hashed
+GROUP BY c.course_id, p.prof_id
+'''
+
+def apply_schema(con):
+    """Create any missing tables, indexes and reference data"""
+    with open("schema.sql", "r", encoding="utf-8") as f:
+        con.execute(f.read())
+
+def refresh_course_stats(con):
+    """Rebuild the course_stats aggregate table from the review data"""
+    con.execute("BEGIN TRANSACTION")
+    try:
+        con.execute("DELETE FROM course_stats")
+        con.execute(COURSE_STATS_QUERY)
+        con.execute("COMMIT")
+    except Exception:
+        con.execute("ROLLBACK")
+        raise
+
+def run_build(con) -> int:
+    """Replace the table contents with the CSV files and return the number of rows loaded"""
+    apply_schema(con)
+    # Clear child tables before their parents. Each delete commits on its own:
+    # DuckDB checks foreign keys against committed rows, so a parent delete in
+    # the same transaction as its children's would still see them.
+    for name in reversed(TABLES):
+        con.execute(f"DELETE FROM {name}")
+    # One transaction for the whole load: a single WAL commit, and a bad file
+    # leaves the tables empty rather than half loaded
+    con.execute("BEGIN TRANSACTION")
+    try:
+        loaded = 0
+        for name in TABLES:
+            path = f"{DATA_DIR}/{name}.csv"
+            # The CSVs carry a subset of each table's columns, named in the header
+            with open(path, "r", newline="", encoding="utf-8") as f:
+                columns = ", ".join(next(csv.reader(f)))
+            loaded += con.execute(f"COPY {name} ({columns}) FROM '{path}' (FORMAT CSV, HEADER TRUE, PARALLEL TRUE)").fetchone()[0]
+        con.execute("COMMIT")
+    except Exception:
+        con.execute("ROLLBACK")
+        raise
+    refresh_course_stats(con)
+    # Fold the bulk load into the database file now rather than on a later write;
+    # when another cursor on the database is mid-query, DuckDB checkpoints later itself
+    try:
+        con.execute("CHECKPOINT")
+    except duckdb.TransactionException:
+        pass
+    return loaded
+
+if __name__ == "__main__":
+    con = duckdb.connect(DB_PATH)
+    con.execute(f"PRAGMA threads={os.cpu_count() or 4}")
+    run_build(con)
+    print(f"Built DuckDB at {DB_PATH}")
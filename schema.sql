@@ -42,6 +42,22 @@ CREATE TABLE IF NOT EXISTS reviews (
   grade_received TEXT
 );
 
+-- Precomputed per course/professor review aggregates used to rank courses.
+-- Rebuilt by build_db.refresh_course_stats() whenever reviews are loaded.
+CREATE TABLE IF NOT EXISTS course_stats (
+  course_id INTEGER,
+  prof_id INTEGER,
+  dept TEXT,
+  number TEXT,
+  title TEXT,
+  ge_area TEXT,
+  professor TEXT,
+  review_count INTEGER,
+  avg_quality DOUBLE,
+  avg_workload DOUBLE,
+  score DOUBLE
+);
+
 -- Table for college/school information
 CREATE TABLE IF NOT EXISTS colleges (
   college_id INTEGER PRIMARY KEY,
@@ -138,4 +154,5 @@ CREATE INDEX IF NOT EXISTS idx_sections_course_id ON sections(course_id);
 CREATE INDEX IF NOT EXISTS idx_sections_prof_id ON sections(prof_id);
 CREATE INDEX IF NOT EXISTS idx_reviews_section_id ON reviews(section_id);
 CREATE INDEX IF NOT EXISTS idx_reviews_quality ON reviews(quality);
-CREATE INDEX IF NOT EXISTS idx_reviews_workload ON reviews(workload);
\ No newline at end of file
+CREATE INDEX IF NOT EXISTS idx_reviews_workload ON reviews(workload);
+CREATE INDEX IF NOT EXISTS idx_course_stats_ge_area ON course_stats(ge_area);
\ No newline at end of file